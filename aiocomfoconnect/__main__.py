@@ -6,7 +6,6 @@ import argparse
 import asyncio
 import logging
 import sys
-from asyncio import Future
 from typing import Literal
 
 from aiocomfoconnect import DEFAULT_NAME, DEFAULT_PIN, DEFAULT_UUID
@@ -248,9 +247,8 @@ async def run_show_sensors(host: str, uuid: str):
         print("Could not connect to bridge. Please register first.")
         sys.exit(1)
 
-    # Register all sensors
-    for sensor in SENSORS.values():
-        await comfoconnect.register_sensor(sensor)
+    # Register all sensors, ComfoConnect limits how many registrations are in flight at the same time
+    await asyncio.gather(*(comfoconnect.register_sensor(sensor) for sensor in SENSORS.values()))
 
     try:
         while True:
@@ -275,7 +273,7 @@ async def run_show_sensors(host: str, uuid: str):
 
 async def run_show_sensor(host: str, uuid: str, sensor: int, follow=False):
     """Show a sensor."""
-    result = Future()
+    result = asyncio.get_running_loop().create_future()
 
     # Discover bridge so we know the UUID
     bridges = await discover_bridges(host)
@@ -144,7 +144,10 @@ class Bridge:
         # Construct the message
         cmd = zehnder_pb2.GatewayOperation()  # pylint: disable=no-member
         cmd.type = request_type
-        cmd.reference = self._reference
+        cmd.reference = reference = self._reference
+
+        # Increase message reference for next message before yielding, so concurrent requests never share a reference
+        self._reference += 1
 
         msg = request()
         if params is not None:
@@ -155,9 +158,9 @@ class Bridge:
         message = Message(cmd, msg, self._local_uuid, self.uuid)
 
         # Create the future that will contain the response
-        fut = asyncio.Future()
+        fut = self._loop.create_future()
         if reply:
-            self._event_bus.add_listener(self._reference, fut)
+            self._event_bus.add_listener(reference, fut)
         else:
             fut.set_result(None)
 
@@ -166,9 +169,6 @@ class Bridge:
         self._writer.write(message.encode())
         await self._writer.drain()
 
-        # Increase message reference for next message
-        self._reference += 1
-
         try:
             return await asyncio.wait_for(fut, TIMEOUT)
         except asyncio.TimeoutError as exc:
@@ -3,11 +3,17 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import json
 import logging
+import math
+import struct
 from asyncio import Future
+from dataclasses import dataclass
 from typing import Callable, Dict, List, Literal
 
 from aiocomfoconnect import Bridge
+from aiocomfoconnect.bridge import Message
 from aiocomfoconnect.const import (
     ERRORS,
     ERRORS_140,
@@ -20,7 +26,6 @@ from aiocomfoconnect.const import (
     SUBUNIT_08,
     UNIT_ERROR,
     UNIT_SCHEDULE,
-    UNIT_TEMPHUMCONTROL,
     UNIT_VENTILATIONCONFIG,
     ComfoCoolMode,
     PdoType,
@@ -35,140 +40,560 @@ from aiocomfoconnect.exceptions import (
     AioComfoConnectTimeout,
     ComfoConnectNotAllowed,
 )
-from aiocomfoconnect.properties import Property
+from aiocomfoconnect.properties import (
+    PROPERTY_SENSOR_VENTILATION_HUMIDITY_COMFORT,
+    PROPERTY_SENSOR_VENTILATION_HUMIDITY_PROTECTION,
+    PROPERTY_SENSOR_VENTILATION_TEMP_PASSIVE,
+    Property,
+)
 from aiocomfoconnect.sensors import Sensor
-from aiocomfoconnect.util import bytearray_to_bits, bytestring, encode_pdo_value
+from aiocomfoconnect.util import bytearray_to_bits, encode_pdo_value
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 _LOGGER = logging.getLogger(__name__)
 
+# GETPROPERTY frame: command, unit, subunit, 0x10, property
+_GET_PROPERTY = struct.Struct("<BBBBB")
+
+# SETPROPERTY frame with a single byte value: command, unit, subunit, property, value
+_SET_PROPERTY_UINT8 = struct.Struct("<BBBBB")
+
+# ENABLETIMERENTRY frame: command, unit, subunit, property, 4 zero bytes, timeout (signed), value
+_TIMER_ENTRY = struct.Struct("<BBBBIiB")
+
+
+def _timer_entry_builder(subunit: int, property_id: int) -> Callable[[int, int], bytes]:
+    """Return a function that builds the ENABLETIMERENTRY frame for a schedule entry from a timeout and a value."""
+    return functools.partial(_TIMER_ENTRY.pack, 0x84, UNIT_SCHEDULE, subunit, property_id, 0)
+
+
+_SET_SPEED = _timer_entry_builder(SUBUNIT_01, 0x01)
+_SET_BOOST = _timer_entry_builder(SUBUNIT_01, 0x06)
+_SET_AWAY = _timer_entry_builder(SUBUNIT_01, 0x0B)
+_SET_BYPASS = _timer_entry_builder(SUBUNIT_02, 0x01)
+_SET_TEMPERATURE_PROFILE = _timer_entry_builder(SUBUNIT_03, 0x01)
+_SET_COMFOCOOL = _timer_entry_builder(SUBUNIT_05, 0x01)
+_SET_SUPPLY_FAN = _timer_entry_builder(SUBUNIT_06, 0x01)
+_SET_EXHAUST_FAN = _timer_entry_builder(SUBUNIT_07, 0x01)
+_SET_MODE = _timer_entry_builder(SUBUNIT_08, 0x01)
+
+# GETTIMERENTRY and DISABLETIMERENTRY frames don't take arguments, so build them once
+_GET_SPEED = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x01])
+_GET_BOOST = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x06])
+_DISABLE_BOOST = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_01, 0x06])
+_GET_AWAY = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x0B])
+_DISABLE_AWAY = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_01, 0x0B])
+_GET_BYPASS = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_02, 0x01])
+_DISABLE_BYPASS = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_02, 0x01])
+_GET_TEMPERATURE_PROFILE = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_03, 0x01])
+_GET_COMFOCOOL = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_05, 0x01])
+_DISABLE_COMFOCOOL = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_05, 0x01])
+_GET_SUPPLY_FAN = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_06, 0x01])
+_DISABLE_SUPPLY_FAN = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_06, 0x01])
+_GET_EXHAUST_FAN = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_07, 0x01])
+_DISABLE_EXHAUST_FAN = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_07, 0x01])
+_GET_MODE = bytes([0x83, UNIT_SCHEDULE, SUBUNIT_08, 0x01])
+_DISABLE_MODE = bytes([0x85, UNIT_SCHEDULE, SUBUNIT_08, 0x01])
+_CLEAR_ERRORS = bytes([0x82, UNIT_ERROR, 0x01])
+
+# The speed frames don't depend on any argument, so build them once
+_SPEED_FRAMES = {
+    VentilationSpeed.AWAY: _SET_SPEED(1, 0x00),
+    VentilationSpeed.LOW: _SET_SPEED(1, 0x01),
+    VentilationSpeed.MEDIUM: _SET_SPEED(1, 0x02),
+    VentilationSpeed.HIGH: _SET_SPEED(1, 0x03),
+}
+
+# Speeds by the value of the speed schedule entry
+_SPEEDS = {
+    0x00: VentilationSpeed.AWAY,
+    0x01: VentilationSpeed.LOW,
+    0x02: VentilationSpeed.MEDIUM,
+    0x03: VentilationSpeed.HIGH,
+}
+
+# Properties of the VENTILATIONCONFIG unit that hold the airflow in m³/h for each speed
+_FLOW_PROPERTIES = {
+    VentilationSpeed.AWAY: 3,
+    VentilationSpeed.LOW: 4,
+    VentilationSpeed.MEDIUM: 5,
+    VentilationSpeed.HIGH: 6,
+}
+
+# Values of the bypass schedule entry, auto disables the entry instead
+_BYPASS_VALUES = {
+    VentilationSetting.ON: 0x01,
+    VentilationSetting.OFF: 0x02,
+}
+_BYPASS_MODES = {0x00: VentilationSetting.AUTO, **{value: mode for mode, value in _BYPASS_VALUES.items()}}
+
+_TEMPERATURE_PROFILE_VALUES = {
+    VentilationTemperatureProfile.NORMAL: 0x00,
+    VentilationTemperatureProfile.COOL: 0x01,
+    VentilationTemperatureProfile.WARM: 0x02,
+}
+_TEMPERATURE_PROFILES = {value: profile for profile, value in _TEMPERATURE_PROFILE_VALUES.items()}
+
+# Values of the sensor based ventilation mode properties of the TEMPHUMCONTROL unit
+_SENSOR_VENTMODE_VALUES = {
+    VentilationSetting.OFF: 0,
+    VentilationSetting.AUTO: 1,
+    VentilationSetting.ON: 2,
+}
+_SENSOR_VENTMODES = {value: mode for mode, value in _SENSOR_VENTMODE_VALUES.items()}
+
+# Nodes running firmware 1.4.0 and below report their errors with the ERRORS_140 numbering
+_FIRMWARE_1_4_0 = 3222278144  # 0xC0101000, see util.version_decode
+
+# Maximum number of RPDO registrations that are in flight at the same time, so registering all sensors doesn't flood the bridge
+_RPDO_CONCURRENCY = 8
+
+_decode_signed = functools.partial(int.from_bytes, byteorder="little", signed=True)
+_decode_unsigned = functools.partial(int.from_bytes, byteorder="little", signed=False)
+
+# Decoders for the property types, the width of integers is taken from the response
+_PROPERTY_DECODERS = {
+    PdoType.TYPE_CN_STRING: lambda message: message.decode("utf-8").rstrip("\x00"),
+    PdoType.TYPE_CN_INT8: _decode_signed,
+    PdoType.TYPE_CN_INT16: _decode_signed,
+    PdoType.TYPE_CN_INT64: _decode_signed,
+    PdoType.TYPE_CN_UINT8: _decode_unsigned,
+    PdoType.TYPE_CN_UINT16: _decode_unsigned,
+    PdoType.TYPE_CN_UINT32: _decode_unsigned,
+    PdoType.TYPE_CN_BOOL: lambda message: message[0] == 1,
+}
+
+# Widths of the fixed-width property types in a get multiple properties (0x02) response, strings end with a NUL byte instead
+_PROPERTY_WIDTHS = {
+    PdoType.TYPE_CN_BOOL: 1,
+    PdoType.TYPE_CN_INT8: 1,
+    PdoType.TYPE_CN_UINT8: 1,
+    PdoType.TYPE_CN_INT16: 2,
+    PdoType.TYPE_CN_UINT16: 2,
+    PdoType.TYPE_CN_UINT32: 4,
+    PdoType.TYPE_CN_INT64: 8,
+}
+
+# The number of properties in a get multiple properties (0x02) request is OR'ed into the low nibble of the type
+_MAX_MULTIPLE_PROPERTIES = 0x0F
+
+
+def _decode_property(message: bytes, property_type: int | None):
+    """Convert a property value to the right type, or return it as is when the type has no decoder."""
+    decoder = _PROPERTY_DECODERS.get(property_type)
+    if decoder is not None:
+        return decoder(message)
+    return message
+
+
+def _split_multiple_properties(message: bytes, property_types: List[int]) -> List[bytes] | None:
+    """Split a get multiple properties (0x02) response into the values of the properties, or return None when it doesn't match the types."""
+    values = []
+    offset = 0
+    for property_type in property_types:
+        if property_type == PdoType.TYPE_CN_STRING:
+            end = message.find(b"\x00", offset) + 1
+            if end == 0:
+                return None
+        else:
+            width = _PROPERTY_WIDTHS.get(property_type)
+            if width is None:
+                return None
+            end = offset + width
+        values.append(message[offset:end])
+        offset = end
 
-class ComfoConnect(Bridge):
-    """Abstraction layer over the ComfoConnect LAN C API."""
+    # A response with bytes left over, or too few of them, doesn't have the widths we expected
+    if offset != len(message):
+        return None
+
+    return values
+
+
+def _json_finite(value):
+    """Replace the non-finite floats in a value with None, as orjson serializes them as null."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (list, tuple)):
+        return [_json_finite(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _json_finite(item) for key, item in value.items()}
+    return value
+
+
+def _json_bytes(value) -> bytes:
+    """Serialize a sensor value to compact JSON bytes, using orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    try:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode()
+    except ValueError:
+        # Only non-finite floats are rejected, write them as null like orjson does
+        return json.dumps(_json_finite(value), separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _json_transform(transform: Callable, value) -> bytes:
+    """Apply a sensor transform and serialize the result."""
+    return _json_bytes(transform(value))
+
+
+@dataclass(slots=True)
+class _PendingWrite:
+    """A write that waits for the previous write to the same setting, with the latest value to send and the task that sends it."""
 
-    def __init__(self, host: str, uuid: str, loop=None, sensor_callback=None, alarm_callback=None, sensor_delay=2):
-        """Initialize the ComfoConnect class."""
+    message: bytes
+    task: asyncio.Task | None = None
+
+
+@dataclass(slots=True)
+class _RegisteredSensor:
+    """A sensor registered on the bridge, together with the transform for its values (None passes the value on as is) and the last emitted value."""
+
+    sensor: Sensor
+    transform: Callable[[int], any] | None
+    value: int | None = None
+
+
+@dataclass(slots=True)
+class SensorVentmodes:
+    """The sensor based ventilation mode settings (auto / on / off)."""
+
+    temperature_passive: str
+    humidity_comfort: str
+    humidity_protection: str
+
+
+class ComfoConnect(Bridge):
+    """Abstraction layer over the ComfoConnect LAN C API.
+
+    The setters of the ventilation settings (set_speed, set_bypass, set_mode, ...) send one write per setting at a time. When several writes to the
+    same setting are made while one is still in flight, the last one wins: only its value is sent, and the writes it replaced return its result.
+    """
+
+    # Bridge doesn't define __slots__, so instances still have a __dict__, but the attributes used on every sensor update become slots.
+    __slots__ = (
+        "sensor_delay",
+        "sensor_callback_format",
+        "sensor_dedupe",
+        "_sensor_callback_fn",
+        "_alarm_callback_fn",
+        "_sensors",
+        "_sensor_hold",
+        "_held_values",
+        "_alarm_cache",
+        "_pending_reads",
+        "_pending_writes",
+        "_write_locks",
+        "_rpdo_requests",
+        "_reconnect_task",
+    )
+
+    def __init__(
+        self,
+        host: str,
+        uuid: str,
+        loop=None,
+        sensor_callback=None,
+        alarm_callback=None,
+        sensor_delay=2,
+        sensor_callback_format: Literal["value", "bytes"] = "value",
+        sensor_dedupe: bool = False,
+    ):
+        """Initialize the ComfoConnect class.
+
+        With `sensor_callback_format="bytes"`, the sensor callback receives the value already serialized as JSON bytes (e.g. `b"21.5"`) instead
+        of the Python value, so consumers that publish the values don't have to format them again.
+
+        With `sensor_dedupe=True`, sensor updates that repeat the last emitted value are not passed to the sensor callback. The values emitted
+        when the sensor hold expires after (re)connecting are always passed on.
+        """
         super().__init__(host, uuid, loop)
 
+        if sensor_callback_format not in ("value", "bytes"):
+            raise ValueError(f"Invalid sensor callback format: {sensor_callback_format}")
+
         self.set_sensor_callback(self._sensor_callback)  # Set the callback to our _sensor_callback method, so we can proces the callbacks.
         self.set_alarm_callback(self._alarm_callback)  # Set the callback to our _alarm_callback method, so we can proces the callbacks.
         self.sensor_delay = sensor_delay
+        self.sensor_callback_format = sensor_callback_format
+        self.sensor_dedupe = sensor_dedupe
 
         self._sensor_callback_fn: Callable = sensor_callback
         self._alarm_callback_fn: Callable = alarm_callback
-        self._sensors: Dict[int, Sensor] = {}
-        self._sensors_values: Dict[int, any] = {}
+        self._sensors: Dict[int, _RegisteredSensor] = {}
         self._sensor_hold = None
+        self._held_values: Dict[int, int] = {}
+        self._alarm_cache: Dict[int, tuple[int, bytes, dict]] = {}
+        self._pending_reads: Dict[tuple[int, bytes], asyncio.Task] = {}
+        self._pending_writes: Dict[tuple[int, bytes], _PendingWrite] = {}
+        self._write_locks: Dict[tuple[int, bytes], asyncio.Lock] = {}
+        self._rpdo_requests = asyncio.Semaphore(_RPDO_CONCURRENCY)
 
-        self._tasks = set()
+        self._reconnect_task: asyncio.Task | None = None
 
     def _unhold_sensors(self):
         """Unhold the sensors."""
+        if self._sensor_hold is None:
+            return
+
         _LOGGER.debug("Unholding sensors")
         self._sensor_hold = None
 
-        # Emit the current cached values of the sensors, by now, they should have received a correct update.
-        for sensor_id, _ in self._sensors.items():
-            if self._sensors_values.get(sensor_id) is not None:
-                self._sensor_callback(sensor_id, self._sensors_values.get(sensor_id))
-
-    async def connect(self, uuid: str):
-        """Connect to the bridge."""
-        connected: Future = Future()
+        held_values, self._held_values = self._held_values, {}
 
-        async def _reconnect_loop():
-            while True:
-                try:
-                    # Connect to the bridge
-                    read_task = await self._connect(uuid)
-
-                    # Start session
-                    await self.cmd_start_session(True)
+        # Emit the current cached values of the sensors, by now, they should have received a correct update.
+        for sensor_id, sensor_value in held_values.items():
+            registered = self._sensors.get(sensor_id)
+            if registered is None:
+                _LOGGER.error("Unknown sensor id: %s", sensor_id)
+                continue
 
-                    # Wait for a specified amount of seconds to buffer sensor values.
-                    # This is to work around a bug where the bridge sends invalid sensor values when connecting.
-                    if self.sensor_delay:
-                        _LOGGER.debug("Holding sensors for %s second(s)", self.sensor_delay)
-                        self._sensors_values = {}
-                        self._sensor_hold = self._loop.call_later(self.sensor_delay, self._unhold_sensors)
+            registered.value = sensor_value
+            self._sensor_callback_fn(registered.sensor, sensor_value if registered.transform is None else registered.transform(sensor_value))
 
-                    # Register the sensors again (in case we lost the connection)
-                    for sensor in self._sensors.values():
-                        await self.cmd_rpdo_request(sensor.id, sensor.type)
+    async def _register_sensors(self):
+        """Register all known sensors on the bridge again."""
+        # Requests each get their own reference, so they can be pipelined on the connection
+        await asyncio.gather(*(self._register_sensor_rpdo(registered.sensor) for registered in self._sensors.values()))
 
-                    if not connected.done():
-                        connected.set_result(True)
+    async def _register_sensor_rpdo(self, sensor: Sensor):
+        """Send the RPDO request for a sensor, with a limited number of them in flight."""
+        async with self._rpdo_requests:
+            await self.cmd_rpdo_request(sensor.id, sensor.type)
 
-                    # Wait for the read task to finish or throw an exception
-                    await read_task
+    async def connect(self, uuid: str):
+        """Connect to the bridge."""
+        loop = self._loop
+        connected: Future = loop.create_future()
 
-                    if read_task.result() is False:
-                        # We are shutting down.
+        async def _reconnect_loop():
+            try:
+                while True:
+                    read_task = None
+                    try:
+                        # Connect to the bridge
+                        read_task = await self._connect(uuid)
+
+                        # Start session
+                        await self.cmd_start_session(True)
+
+                        # Wait for a specified amount of seconds to buffer sensor values.
+                        # This is to work around a bug where the bridge sends invalid sensor values when connecting.
+                        if self.sensor_delay:
+                            _LOGGER.debug("Holding sensors for %s second(s)", self.sensor_delay)
+                            if self._sensor_hold is not None:
+                                # A hold from a previous connection is still pending, replace it
+                                self._sensor_hold.cancel()
+                            self._held_values.clear()
+                            self._sensor_hold = loop.call_later(self.sensor_delay, self._unhold_sensors)
+
+                        # Register the sensors again (in case we lost the connection)
+                        await self._register_sensors()
+
+                        if not connected.done():
+                            connected.set_result(True)
+
+                        # Wait for the read task to finish or throw an exception
+                        await read_task
+
+                        if read_task.result() is False:
+                            # We are shutting down.
+                            return
+
+                    except AioComfoConnectTimeout:
+                        # Reconnect after 5 seconds when we could not connect
+                        _LOGGER.info("Could not reconnect. Retrying after 5 seconds.")
+                        await asyncio.sleep(5)
+
+                    except AioComfoConnectNotConnected:
+                        # Reconnect when connection has been dropped
+                        _LOGGER.info("We got disconnected. Reconnecting.")
+
+                    except ComfoConnectNotAllowed as exception:
+                        # Passthrough exception if not allowed (because not registered uuid for example )
+                        if not connected.done():
+                            connected.set_exception(exception)
+                        else:
+                            # connect() has already returned, so there is nobody to pass the exception to
+                            _LOGGER.error("Not allowed to reconnect: %s", exception)
                         return
 
-                except AioComfoConnectTimeout:
-                    # Reconnect after 5 seconds when we could not connect
-                    _LOGGER.info("Could not reconnect. Retrying after 5 seconds.")
-                    await asyncio.sleep(5)
-
-                except AioComfoConnectNotConnected:
-                    # Reconnect when connection has been dropped
-                    _LOGGER.info("We got disconnected. Reconnecting.")
-
-                except ComfoConnectNotAllowed as exception:
-                    # Passthrough exception if not allowed (because not registered uuid for example )
-                    connected.set_exception(exception)
-                    return
-
-        reconnect_task = self._loop.create_task(_reconnect_loop())
-        self._tasks.add(reconnect_task)
-        reconnect_task.add_done_callback(self._tasks.discard)
+                    finally:
+                        # Don't leave the reader of this connection running when we stop or retry before it has finished
+                        if read_task is not None and not read_task.done():
+                            read_task.cancel()
+                            await asyncio.gather(read_task, return_exceptions=True)
+
+            except asyncio.CancelledError:
+                if not connected.done():
+                    # disconnect() stopped the loop while connect() was still waiting for the connection
+                    connected.set_exception(AioComfoConnectNotConnected("Disconnected before the connection was established"))
+                raise
+
+            except BaseException as exception:
+                if connected.done():
+                    raise
+                # Pass the error to connect(), instead of leaving it waiting for a connection that won't come
+                connected.set_exception(exception)
+                if not isinstance(exception, Exception):
+                    raise
+
+        # Keep a reference to the task, so it doesn't get garbage collected and we can cancel it on disconnect
+        self._reconnect_task = loop.create_task(_reconnect_loop())
 
         await connected
 
     async def disconnect(self):
         """Disconnect from the bridge."""
+        # Stop the reconnect loop first, otherwise it would reconnect as soon as we close the connection
+        if self._reconnect_task is not None:
+            reconnect_task, self._reconnect_task = self._reconnect_task, None
+            reconnect_task.cancel()
+            # Wait for the loop to stop the reader of its connection, we are stopping it so how it ends doesn't matter
+            await asyncio.gather(reconnect_task, return_exceptions=True)
+
+        if self._sensor_hold is not None:
+            self._sensor_hold.cancel()
+            self._sensor_hold = None
+
         await self._disconnect()
 
     async def register_sensor(self, sensor: Sensor):
         """Register a sensor on the bridge."""
-        self._sensors[sensor.id] = sensor
-        self._sensors_values[sensor.id] = None
-        await self.cmd_rpdo_request(sensor.id, sensor.type)
+        # Resolve the transform once, so the callback doesn't have to look at the sensor for every update.
+        # PDO values are always decoded as integers, so rounding them was a no-op; sensors without a value_fn get their value as is.
+        transform = sensor.value_fn
+        if self.sensor_callback_format == "bytes":
+            transform = _json_bytes if transform is None else functools.partial(_json_transform, transform)
+        self._sensors[sensor.id] = _RegisteredSensor(sensor, transform)
+        await self._register_sensor_rpdo(sensor)
 
     async def deregister_sensor(self, sensor: Sensor):
         """Deregister a sensor on the bridge."""
         await self.cmd_rpdo_request(sensor.id, sensor.type, timeout=0)
         del self._sensors[sensor.id]
-        del self._sensors_values[sensor.id]
+
+    async def _cmd_rmi_read(self, message: bytes, node_id=1) -> Message:
+        """Sends a RMI request that only reads, sharing the response with identical reads that are still waiting for theirs."""
+        key = (node_id, message)
+        task = self._pending_reads.get(key)
+        if task is None:
+            task = self._loop.create_task(self.cmd_rmi_request(message, node_id=node_id))
+            self._pending_reads[key] = task
+            task.add_done_callback(functools.partial(self._forget_read, key))
+
+        # Shield the shared request, so a caller that gets cancelled doesn't cancel it for the others
+        return await asyncio.shield(task)
+
+    def _forget_read(self, key: tuple[int, bytes], task: asyncio.Task):
+        """Stop sharing a completed read, unless a write already replaced it with a newer one."""
+        if self._pending_reads.get(key) is task:
+            del self._pending_reads[key]
+
+    def _invalidate_reads(self, node_id: int, unit: int, subunit: int, property_id: int):
+        """Stop sharing the in-flight reads of a setting, so a read that starts after a write doesn't get the value from before it."""
+        self._pending_reads.pop((node_id, bytes([0x83, unit, subunit, property_id])), None)
+        self._pending_reads.pop((node_id, _GET_PROPERTY.pack(0x01, unit, subunit, 0x10, property_id)), None)
+
+    async def _cmd_rmi_write(self, message: bytes, node_id=1) -> Message:
+        """Sends a RMI request that writes a setting, only sending the latest value when writes to the same setting pile up."""
+        # The unit, subunit and property identify the setting, for both the SETPROPERTY and the schedule commands
+        key = (node_id, message[1:4])
+
+        # Writes that queue while another write to this setting is in flight are merged, the last one wins
+        pending = self._pending_writes.get(key)
+        if pending is None:
+            pending = self._pending_writes[key] = _PendingWrite(message)
+            pending.task = self._loop.create_task(self._send_pending_write(key, pending, node_id))
+        else:
+            pending.message = message
+
+        # Shield the shared request, so a caller that gets cancelled doesn't cancel it for the others
+        return await asyncio.shield(pending.task)
+
+    async def _send_pending_write(self, key: tuple[int, bytes], pending: _PendingWrite, node_id: int) -> Message:
+        """Sends the latest value of a merged write, once the previous write to the same setting has completed."""
+        lock = self._write_locks.get(key)
+        if lock is None:
+            lock = self._write_locks[key] = asyncio.Lock()
+
+        try:
+            async with lock:
+                # From here on, new writes to this setting start a new merge instead of changing the value we send
+                if self._pending_writes.get(key) is pending:
+                    del self._pending_writes[key]
+                try:
+                    return await self.cmd_rmi_request(pending.message, node_id=node_id)
+                finally:
+                    self._invalidate_reads(node_id, *pending.message[1:4])
+        finally:
+            if self._pending_writes.get(key) is pending:
+                # We got cancelled before sending, new writes must not join a write that won't be sent
+                del self._pending_writes[key]
+
+            # Only a pending write of this setting can still be waiting for the lock, so drop the lock when there is none
+            if key not in self._pending_writes and self._write_locks.get(key) is lock:
+                del self._write_locks[key]
 
     async def get_property(self, prop: Property, node_id=1) -> any:
         """Get a property and convert to the right type."""
         return await self.get_single_property(prop.unit, prop.subunit, prop.property_id, prop.property_type, node_id=node_id)
 
+    async def get_properties(self, props: List[Property], node_id=1) -> list:
+        """Get multiple properties and convert them to the right type."""
+        # Properties of the same unit and subunit are read with one get multiple properties request
+        groups: Dict[tuple[int, int], List[int]] = {}
+        for index, prop in enumerate(props):
+            groups.setdefault((prop.unit, prop.subunit), []).append(index)
+
+        batches = [indexes[i : i + _MAX_MULTIPLE_PROPERTIES] for indexes in groups.values() for i in range(0, len(indexes), _MAX_MULTIPLE_PROPERTIES)]
+
+        # The requests each get their own reference, so send them all at once instead of waiting for every round trip.
+        results = await asyncio.gather(*(self._get_property_batch([props[index] for index in batch], node_id=node_id) for batch in batches))
+
+        # Put the values back in the order of the properties that were asked for
+        values = [None] * len(props)
+        for batch, batch_values in zip(batches, results):
+            for index, value in zip(batch, batch_values):
+                values[index] = value
+        return values
+
+    async def _get_property_batch(self, props: List[Property], node_id=1) -> list:
+        """Get properties of the same unit and subunit with one request and convert them to the right type."""
+        if len(props) == 1:
+            return [await self.get_property(props[0], node_id=node_id)]
+
+        message = await self.get_multiple_properties(props[0].unit, props[0].subunit, [prop.property_id for prop in props], node_id=node_id)
+        values = _split_multiple_properties(message, [prop.property_type for prop in props])
+        if values is None:
+            # The widths in the response don't match the types of the properties, read them one by one instead
+            _LOGGER.debug("Unexpected get multiple properties response %s, reading the properties one by one", message.hex())
+            return list(await asyncio.gather(*(self.get_property(prop, node_id=node_id) for prop in props)))
+
+        return [_decode_property(value, prop.property_type) for prop, value in zip(props, values)]
+
     async def get_single_property(self, unit: int, subunit: int, property_id: int, property_type: int = None, node_id=1) -> any:
         """Get a property and convert to the right type."""
-        result = await self.cmd_rmi_request(bytes([0x01, unit, subunit, 0x10, property_id]), node_id=node_id)
+        result = await self._cmd_rmi_read(_GET_PROPERTY.pack(0x01, unit, subunit, 0x10, property_id), node_id=node_id)
 
-        if property_type == PdoType.TYPE_CN_STRING:
-            return result.message.decode("utf-8").rstrip("\x00")
-        if property_type in [PdoType.TYPE_CN_INT8, PdoType.TYPE_CN_INT16, PdoType.TYPE_CN_INT64]:
-            return int.from_bytes(result.message, byteorder="little", signed=True)
-        if property_type in [PdoType.TYPE_CN_UINT8, PdoType.TYPE_CN_UINT16, PdoType.TYPE_CN_UINT32]:
-            return int.from_bytes(result.message, byteorder="little", signed=False)
-        if property_type in [PdoType.TYPE_CN_BOOL]:
-            return result.message[0] == 1
-
-        return result.message
+        return _decode_property(result.message, property_type)
 
     async def get_multiple_properties(self, unit: int, subunit: int, property_ids: List[int], node_id=1) -> any:
         """Get multiple properties."""
-        result = await self.cmd_rmi_request(bytestring([0x02, unit, subunit, 0x01, 0x10 | len(property_ids), bytes(property_ids)]), node_id=node_id)
+        result = await self.cmd_rmi_request(bytes([0x02, unit, subunit, 0x01, 0x10 | len(property_ids), *property_ids]), node_id=node_id)
 
         return result.message
 
     async def set_property(self, unit: int, subunit: int, property_id: int, value: int, node_id=1) -> any:
         """Set a property."""
-        result = await self.cmd_rmi_request(bytes([0x03, unit, subunit, property_id, value]), node_id=node_id)
+        try:
+            result = await self.cmd_rmi_request(bytes([0x03, unit, subunit, property_id, value]), node_id=node_id)
+        finally:
+            self._invalidate_reads(node_id, unit, subunit, property_id)
 
         return result.message
 
@@ -177,7 +602,10 @@ class ComfoConnect(Bridge):
         value_bytes = encode_pdo_value(value, pdo_type)
         message_bytes = bytes([0x03, unit, subunit, property_id]) + value_bytes
 
-        result = await self.cmd_rmi_request(message_bytes, node_id=node_id)
+        try:
+            result = await self.cmd_rmi_request(message_bytes, node_id=node_id)
+        finally:
+            self._invalidate_reads(node_id, unit, subunit, property_id)
 
         return result.message
 
@@ -186,40 +614,47 @@ class ComfoConnect(Bridge):
         if self._sensor_callback_fn is None:
             return
 
-        sensor = self._sensors.get(sensor_id)
-        if sensor is None:
-            _LOGGER.error("Unknown sensor id: %s", sensor_id)
+        # Don't emit sensor values until we have received all the initial values, only keep the latest one for when the hold expires.
+        # Unknown sensor ids are dropped when the hold expires.
+        if self._sensor_hold is not None:
+            self._held_values[sensor_id] = sensor_value
             return
 
-        self._sensors_values[sensor_id] = sensor_value
-
-        # Don't emit sensor values until we have received all the initial values.
-        if self._sensor_hold is not None:
+        registered = self._sensors.get(sensor_id)
+        if registered is None:
+            _LOGGER.error("Unknown sensor id: %s", sensor_id)
             return
 
-        if sensor.value_fn:
-            val = sensor.value_fn(sensor_value)
-        else:
-            val = round(sensor_value, 2)
-        self._sensor_callback_fn(sensor, val)
+        if self.sensor_dedupe:
+            # Skip updates that repeat the last emitted value
+            if registered.value == sensor_value:
+                return
+            registered.value = sensor_value
+
+        self._sensor_callback_fn(registered.sensor, sensor_value if registered.transform is None else registered.transform(sensor_value))
 
     def _alarm_callback(self, node_id, alarm):
         """Callback function for alarm updates."""
         if self._alarm_callback_fn is None:
             return
 
-        if alarm.swProgramVersion <= 3222278144:
-            # Firmware 1.4.0 and below
-            error_messages = ERRORS_140
+        # A node usually repeats the previous alarm, so reuse the decoded errors when its firmware and error vector didn't change
+        cache = self._alarm_cache.get(node_id)
+        if cache is not None and cache[0] == alarm.swProgramVersion and cache[1] == alarm.errors:
+            errors = cache[2]
         else:
-            error_messages = ERRORS
+            error_messages = ERRORS_140 if alarm.swProgramVersion <= _FIRMWARE_1_4_0 else ERRORS
 
-        errors = {bit: error_messages[bit] for bit in bytearray_to_bits(alarm.errors)}
-        self._alarm_callback_fn(node_id, errors)
+            # Skip bits we don't have a message for, instead of failing on a KeyError
+            errors = {bit: error_messages[bit] for bit in bytearray_to_bits(alarm.errors) if bit in error_messages}
+            self._alarm_cache[node_id] = (alarm.swProgramVersion, alarm.errors, errors)
+
+        # Pass a copy, so the callback can't modify the cached errors
+        self._alarm_callback_fn(node_id, dict(errors))
 
     async def get_mode(self):
         """Get the current mode."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_08, 0x01]))
+        result = await self._cmd_rmi_read(_GET_MODE)
         # 0000000000ffffffff0000000001 = auto
         # 0100000000ffffffffffffffff01 = manual
         mode = result.message[0]
@@ -229,107 +664,102 @@ class ComfoConnect(Bridge):
     async def set_mode(self, mode: Literal["auto", "manual"]):
         """Set the ventilation mode (auto / manual)."""
         if mode == VentilationMode.AUTO:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_08, 0x01]))
+            await self._cmd_rmi_write(_DISABLE_MODE)
         elif mode == VentilationMode.MANUAL:
-            await self.cmd_rmi_request(bytes([0x84, UNIT_SCHEDULE, SUBUNIT_08, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x01]))
+            await self._cmd_rmi_write(_SET_MODE(1, 0x01))
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
     async def get_speed(self):
         """Set the ventilation speed (away / low / medium / high)."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x01]))
+        result = await self._cmd_rmi_read(_GET_SPEED)
         # 0100000000ffffffffffffffff00 = away
         # 0100000000ffffffffffffffff01 = low
         # 0100000000ffffffffffffffff02 = medium
         # 0100000000ffffffffffffffff03 = high
         speed = result.message[-1]
 
-        if speed == 0:
-            return VentilationSpeed.AWAY
-        if speed == 1:
-            return VentilationSpeed.LOW
-        if speed == 2:
-            return VentilationSpeed.MEDIUM
-        if speed == 3:
-            return VentilationSpeed.HIGH
+        ventilation_speed = _SPEEDS.get(speed)
+        if ventilation_speed is None:
+            raise ValueError(f"Invalid speed: {speed}")
 
-        raise ValueError(f"Invalid speed: {speed}")
+        return ventilation_speed
 
     async def set_speed(self, speed: Literal["away", "low", "medium", "high"]):
         """Get the ventilation speed (away / low / medium / high)."""
-        if speed == VentilationSpeed.AWAY:
-            await self.cmd_rmi_request(bytes([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x00]))
-        elif speed == VentilationSpeed.LOW:
-            await self.cmd_rmi_request(bytes([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x01]))
-        elif speed == VentilationSpeed.MEDIUM:
-            await self.cmd_rmi_request(bytes([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x02]))
-        elif speed == VentilationSpeed.HIGH:
-            await self.cmd_rmi_request(bytes([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x00, 0x03]))
-        else:
+        frame = _SPEED_FRAMES.get(speed)
+        if frame is None:
             raise ValueError(f"Invalid speed: {speed}")
 
+        await self._cmd_rmi_write(frame)
+
     async def get_flow_for_speed(self, speed: Literal["away", "low", "medium", "high"]) -> int:
         """Get the targeted airflow in m³/h for the given VentilationSpeed (away / low / medium / high)."""
-
-        match speed:
-            case VentilationSpeed.AWAY:
-                property_id = 3
-            case VentilationSpeed.LOW:
-                property_id = 4
-            case VentilationSpeed.MEDIUM:
-                property_id = 5
-            case VentilationSpeed.HIGH:
-                property_id = 6
+        property_id = _FLOW_PROPERTIES.get(speed)
+        if property_id is None:
+            raise ValueError(f"Invalid speed: {speed}")
 
         return await self.get_single_property(UNIT_VENTILATIONCONFIG, SUBUNIT_01, property_id, PdoType.TYPE_CN_INT16)
 
+    async def get_flows_for_speeds(self, speeds: List[Literal["away", "low", "medium", "high"]]) -> Dict[str, int]:
+        """Get the targeted airflow in m³/h for each of the given VentilationSpeeds (away / low / medium / high)."""
+        speeds = list(dict.fromkeys(speeds))
+        property_ids = []
+        for speed in speeds:
+            property_id = _FLOW_PROPERTIES.get(speed)
+            if property_id is None:
+                raise ValueError(f"Invalid speed: {speed}")
+            property_ids.append(property_id)
+
+        if not property_ids:
+            return {}
+
+        # The flows are INT16 values, so the response of a get multiple properties request is just the flows one after the other
+        message = await self.get_multiple_properties(UNIT_VENTILATIONCONFIG, SUBUNIT_01, property_ids)
+        flows = [flow for (flow,) in struct.iter_unpack("<h", message[: 2 * len(property_ids)])]
+        return dict(zip(speeds, flows))
+
     async def set_flow_for_speed(self, speed: Literal["away", "low", "medium", "high"], desired_flow: int):
         """Set the targeted airflow in m³/h for the given VentilationSpeed (away / low / medium / high)."""
-
-        match speed:
-            case VentilationSpeed.AWAY:
-                property_id = 3
-            case VentilationSpeed.LOW:
-                property_id = 4
-            case VentilationSpeed.MEDIUM:
-                property_id = 5
-            case VentilationSpeed.HIGH:
-                property_id = 6
+        property_id = _FLOW_PROPERTIES.get(speed)
+        if property_id is None:
+            raise ValueError(f"Invalid speed: {speed}")
 
         await self.set_property_typed(UNIT_VENTILATIONCONFIG, SUBUNIT_01, property_id, desired_flow, PdoType.TYPE_CN_INT16)
 
     async def get_bypass(self):
         """Get the bypass mode (auto / on / off)."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_02, 0x01]))
+        result = await self._cmd_rmi_read(_GET_BYPASS)
         # 0000000000080700000000000000 = auto
         # 0100000000100e00000b0e000001 = open
         # 0100000000100e00000d0e000002 = close
         mode = result.message[-1]
 
-        if mode == 0:
-            return VentilationSetting.AUTO
-        if mode == 1:
-            return VentilationSetting.ON
-        if mode == 2:
-            return VentilationSetting.OFF
+        bypass_mode = _BYPASS_MODES.get(mode)
+        if bypass_mode is None:
+            raise ValueError(f"Invalid mode: {mode}")
 
-        raise ValueError(f"Invalid mode: {mode}")
+        return bypass_mode
 
     async def set_bypass(self, mode: Literal["auto", "on", "off"], timeout=-1):
         """Set the bypass mode (auto / on / off)."""
         if mode == VentilationSetting.AUTO:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_02, 0x01]))
-        elif mode == VentilationSetting.ON:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_02, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x01]))
-        elif mode == VentilationSetting.OFF:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_02, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x02]))
-        else:
+            await self._cmd_rmi_write(_DISABLE_BYPASS)
+            return
+
+        value = _BYPASS_VALUES.get(mode)
+        if value is None:
             raise ValueError(f"Invalid mode: {mode}")
 
+        await self._cmd_rmi_write(_SET_BYPASS(timeout, value))
+
     async def get_balance_mode(self):
         """Get the ventilation balance mode (balance / supply only / exhaust only)."""
-        result_06 = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_06, 0x01]))
-        result_07 = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_07, 0x01]))
+        # Both subunits are independent, so query them concurrently
+        result_06, result_07 = await asyncio.gather(
+            self._cmd_rmi_read(_GET_SUPPLY_FAN),
+            self._cmd_rmi_read(_GET_EXHAUST_FAN),
+        )
         # result_06:
         # 0000000000080700000000000001 = balance
         # 0100000000100e00000e0e000001 = supply only
@@ -353,21 +783,28 @@ class ComfoConnect(Bridge):
 
     async def set_balance_mode(self, mode: Literal["balance", "supply_only", "exhaust_only"], timeout=-1):
         """Set the ventilation balance mode (balance / supply only / exhaust only)."""
+        # The supply (06) and exhaust (07) subunits are independent, so send both commands concurrently
         if mode == VentilationBalance.BALANCE:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_06, 0x01]))
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_07, 0x01]))
+            await asyncio.gather(
+                self._cmd_rmi_write(_DISABLE_SUPPLY_FAN),
+                self._cmd_rmi_write(_DISABLE_EXHAUST_FAN),
+            )
         elif mode == VentilationBalance.SUPPLY_ONLY:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_06, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x01]))
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_07, 0x01]))
+            await asyncio.gather(
+                self._cmd_rmi_write(_SET_SUPPLY_FAN(timeout, 0x01)),
+                self._cmd_rmi_write(_DISABLE_EXHAUST_FAN),
+            )
         elif mode == VentilationBalance.EXHAUST_ONLY:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_06, 0x01]))
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_07, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x01]))
+            await asyncio.gather(
+                self._cmd_rmi_write(_DISABLE_SUPPLY_FAN),
+                self._cmd_rmi_write(_SET_EXHAUST_FAN(timeout, 0x01)),
+            )
         else:
             raise ValueError(f"Invalid mode: {mode}")
 
     async def get_boost(self):
         """Get boost mode."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x06]))
+        result = await self._cmd_rmi_read(_GET_BOOST)
         # 0000000000580200000000000003 = not active
         # 0100000000580200005602000003 = active
         mode = result.message[0]
@@ -377,13 +814,13 @@ class ComfoConnect(Bridge):
     async def set_boost(self, mode: bool, timeout=3600):
         """Activate boost mode."""
         if mode:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x06, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x03]))
+            await self._cmd_rmi_write(_SET_BOOST(timeout, 0x03))
         else:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_01, 0x06]))
+            await self._cmd_rmi_write(_DISABLE_BOOST)
 
     async def get_away(self):
         """Get away mode."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_01, 0x0B]))
+        result = await self._cmd_rmi_read(_GET_AWAY)
         # 0000000000b00400000000000000 = not active
         # 0100000000550200005302000000 = active
         mode = result.message[0]
@@ -393,135 +830,101 @@ class ComfoConnect(Bridge):
     async def set_away(self, mode: bool, timeout=3600):
         """Activate away mode."""
         if mode:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_01, 0x0B, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x00]))
+            await self._cmd_rmi_write(_SET_AWAY(timeout, 0x00))
         else:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_01, 0x0B]))
+            await self._cmd_rmi_write(_DISABLE_AWAY)
 
     async def get_comfocool_mode(self):
         """Get the current comfocool mode."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_05, 0x01]))
+        result = await self._cmd_rmi_read(_GET_COMFOCOOL)
         mode = result.message[0]
         return mode == 0
 
     async def set_comfocool_mode(self, mode: Literal["auto", "off"], timeout=-1):
         """Set the comfocool mode (auto / off)."""
         if mode == ComfoCoolMode.AUTO:
-            await self.cmd_rmi_request(bytes([0x85, UNIT_SCHEDULE, SUBUNIT_05, 0x01]))
+            await self._cmd_rmi_write(_DISABLE_COMFOCOOL)
         elif mode == ComfoCoolMode.OFF:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_05, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x00]))
+            await self._cmd_rmi_write(_SET_COMFOCOOL(timeout, 0x00))
 
     async def get_temperature_profile(self):
         """Get the temperature profile (warm / normal / cool)."""
-        result = await self.cmd_rmi_request(bytes([0x83, UNIT_SCHEDULE, SUBUNIT_03, 0x01]))
+        result = await self._cmd_rmi_read(_GET_TEMPERATURE_PROFILE)
         # 0100000000ffffffffffffffff02 = warm
         # 0100000000ffffffffffffffff00 = normal
         # 0100000000ffffffffffffffff01 = cool
         mode = result.message[-1]
 
-        if mode == 2:
-            return VentilationTemperatureProfile.WARM
-        if mode == 0:
-            return VentilationTemperatureProfile.NORMAL
-        if mode == 1:
-            return VentilationTemperatureProfile.COOL
+        profile = _TEMPERATURE_PROFILES.get(mode)
+        if profile is None:
+            raise ValueError(f"Invalid mode: {mode}")
 
-        raise ValueError(f"Invalid mode: {mode}")
+        return profile
 
     async def set_temperature_profile(self, profile: Literal["warm", "normal", "cool"], timeout=-1):
         """Set the temperature profile (warm / normal / cool)."""
-        if profile == VentilationTemperatureProfile.WARM:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_03, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x02]))
-        elif profile == VentilationTemperatureProfile.NORMAL:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_03, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x00]))
-        elif profile == VentilationTemperatureProfile.COOL:
-            await self.cmd_rmi_request(bytestring([0x84, UNIT_SCHEDULE, SUBUNIT_03, 0x01, 0x00, 0x00, 0x00, 0x00, timeout.to_bytes(4, "little", signed=True), 0x01]))
-        else:
+        value = _TEMPERATURE_PROFILE_VALUES.get(profile)
+        if value is None:
             raise ValueError(f"Invalid profile: {profile}")
 
-    async def get_sensor_ventmode_temperature_passive(self):
-        """Get sensor based ventilation mode - temperature passive (auto / on / off)."""
-        result = await self.cmd_rmi_request(bytes([0x01, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x10, 0x04]))
+        await self._cmd_rmi_write(_SET_TEMPERATURE_PROFILE(timeout, value))
+
+    async def _get_sensor_ventmode(self, prop: Property):
+        """Get a sensor based ventilation mode setting of the TEMPHUMCONTROL unit (auto / on / off)."""
+        result = await self._cmd_rmi_read(_GET_PROPERTY.pack(0x01, prop.unit, prop.subunit, 0x10, prop.property_id))
         # 00 = off
         # 01 = auto
         # 02 = on
-        mode = int.from_bytes(result.message, "little")
+        mode = result.message[0]
+
+        setting = _SENSOR_VENTMODES.get(mode)
+        if setting is None:
+            raise ValueError(f"Invalid mode: {mode}")
 
-        if mode == 1:
-            return VentilationSetting.AUTO
-        if mode == 2:
-            return VentilationSetting.ON
-        if mode == 0:
-            return VentilationSetting.OFF
+        return setting
 
-        raise ValueError(f"Invalid mode: {mode}")
+    async def _set_sensor_ventmode(self, prop: Property, mode: Literal["auto", "on", "off"]):
+        """Configure a sensor based ventilation mode setting of the TEMPHUMCONTROL unit (auto / on / off)."""
+        value = _SENSOR_VENTMODE_VALUES.get(mode)
+        if value is None:
+            raise ValueError(f"Invalid mode: {mode}")
+
+        await self._cmd_rmi_write(_SET_PROPERTY_UINT8.pack(0x03, prop.unit, prop.subunit, prop.property_id, value))
+
+    async def get_sensor_ventmode_temperature_passive(self):
+        """Get sensor based ventilation mode - temperature passive (auto / on / off)."""
+        return await self._get_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_TEMP_PASSIVE)
 
     async def set_sensor_ventmode_temperature_passive(self, mode: Literal["auto", "on", "off"]):
         """Configure sensor based ventilation mode - temperature passive (auto / on / off)."""
-        if mode == VentilationSetting.AUTO:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x04, 0x01]))
-        elif mode == VentilationSetting.ON:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x04, 0x02]))
-        elif mode == VentilationSetting.OFF:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x04, 0x00]))
-        else:
-            raise ValueError(f"Invalid mode: {mode}")
+        await self._set_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_TEMP_PASSIVE, mode)
 
     async def get_sensor_ventmode_humidity_comfort(self):
         """Get sensor based ventilation mode - humidity comfort (auto / on / off)."""
-        result = await self.cmd_rmi_request(bytes([0x01, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x10, 0x06]))
-        # 00 = off
-        # 01 = auto
-        # 02 = on
-        mode = int.from_bytes(result.message, "little")
-
-        if mode == 1:
-            return VentilationSetting.AUTO
-        if mode == 2:
-            return VentilationSetting.ON
-        if mode == 0:
-            return VentilationSetting.OFF
-
-        raise ValueError(f"Invalid mode: {mode}")
+        return await self._get_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_HUMIDITY_COMFORT)
 
     async def set_sensor_ventmode_humidity_comfort(self, mode: Literal["auto", "on", "off"]):
         """Configure sensor based ventilation mode - humidity comfort (auto / on / off)."""
-        if mode == VentilationSetting.AUTO:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x06, 0x01]))
-        elif mode == VentilationSetting.ON:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x06, 0x02]))
-        elif mode == VentilationSetting.OFF:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x06, 0x00]))
-        else:
-            raise ValueError(f"Invalid mode: {mode}")
+        await self._set_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_HUMIDITY_COMFORT, mode)
 
     async def get_sensor_ventmode_humidity_protection(self):
         """Get sensor based ventilation mode - humidity protection (auto / on / off)."""
-        result = await self.cmd_rmi_request(bytes([0x01, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x10, 0x07]))
-        # 00 = off
-        # 01 = auto
-        # 02 = on
-        mode = int.from_bytes(result.message, "little")
-
-        if mode == 1:
-            return VentilationSetting.AUTO
-        if mode == 2:
-            return VentilationSetting.ON
-        if mode == 0:
-            return VentilationSetting.OFF
-
-        raise ValueError(f"Invalid mode: {mode}")
+        return await self._get_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_HUMIDITY_PROTECTION)
 
     async def set_sensor_ventmode_humidity_protection(self, mode: Literal["auto", "on", "off"]):
         """Configure sensor based ventilation mode - humidity protection (auto / on / off)."""
-        if mode == VentilationSetting.AUTO:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x07, 0x01]))
-        elif mode == VentilationSetting.ON:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x07, 0x02]))
-        elif mode == VentilationSetting.OFF:
-            await self.cmd_rmi_request(bytes([0x03, UNIT_TEMPHUMCONTROL, SUBUNIT_01, 0x07, 0x00]))
-        else:
-            raise ValueError(f"Invalid mode: {mode}")
+        await self._set_sensor_ventmode(PROPERTY_SENSOR_VENTILATION_HUMIDITY_PROTECTION, mode)
+
+    async def get_sensor_ventmodes(self) -> SensorVentmodes:
+        """Get all sensor based ventilation mode settings (auto / on / off)."""
+        return SensorVentmodes(
+            *await asyncio.gather(
+                self.get_sensor_ventmode_temperature_passive(),
+                self.get_sensor_ventmode_humidity_comfort(),
+                self.get_sensor_ventmode_humidity_protection(),
+            )
+        )
 
     async def clear_errors(self):
         """Clear the errors."""
-        await self.cmd_rmi_request(bytes([0x82, UNIT_ERROR, 0x01]))
+        await self.cmd_rmi_request(_CLEAR_ERRORS)
@@ -10,27 +10,25 @@ def bytestring(arr):
     return b"".join([i if isinstance(i, bytes) else bytes([i]) for i in arr])
 
 
-def bytearray_to_bits(arr):
-    """Convert a bytearray to a list of set bits."""
+def _int_to_bits(value):
+    """Convert a non-negative integer to a list of set bits, lowest first."""
+    # Peel off the lowest set bit on each iteration, so we only loop once per set bit instead of once per bit.
     bits = []
-    j = 0
-    for byte in arr:
-        for i in range(8):
-            if byte & (1 << i):
-                bits.append(j)
-            j += 1
+    while value:
+        lowest = value & -value
+        bits.append(lowest.bit_length() - 1)
+        value ^= lowest
     return bits
 
 
+def bytearray_to_bits(arr):
+    """Convert a bytearray to a list of set bits."""
+    return _int_to_bits(int.from_bytes(arr, byteorder="little"))
+
+
 def uint_to_bits(value):
     """Convert an unsigned integer to a list of set bits."""
-    bits = []
-    j = 0
-    for i in range(64):
-        if value & (1 << i):
-            bits.append(j)
-        j += 1
-    return bits
+    return _int_to_bits(value & 0xFFFFFFFFFFFFFFFF)
 
 
 def version_decode(version):
@@ -0,0 +1,496 @@
+"""Tests for the ComfoConnect class."""
+
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from aiocomfoconnect import ComfoConnect
+from aiocomfoconnect.comfoconnect import (
+    _GET_PROPERTY,
+    _GET_SPEED,
+    _RPDO_CONCURRENCY,
+    _SET_BYPASS,
+    _SET_SPEED,
+    _json_bytes,
+)
+from aiocomfoconnect.const import ERRORS, ERRORS_140, PdoType
+from aiocomfoconnect.exceptions import (
+    AioComfoConnectNotConnected,
+    AioComfoConnectTimeout,
+)
+from aiocomfoconnect.properties import Property
+from aiocomfoconnect.sensors import SENSOR_TEMPERATURE_SUPPLY, SENSORS
+from aiocomfoconnect.util import bytearray_to_bits
+
+
+class FakeRmi:
+    """Records the RMI requests and lets the test decide when they complete."""
+
+    def __init__(self):
+        self.sent: list[bytes] = []
+        self.replies: list[asyncio.Future] = []
+
+    async def __call__(self, message: bytes, node_id=1):
+        self.sent.append(message)
+        reply = asyncio.get_running_loop().create_future()
+        self.replies.append(reply)
+        return await reply
+
+
+@pytest.fixture
+async def comfoconnect():
+    """ComfoConnect with the RMI requests captured instead of sent to a bridge."""
+    comfoconnect = ComfoConnect("127.0.0.1", "00000000000000000000000000000000")
+    comfoconnect.cmd_rmi_request = FakeRmi()
+    return comfoconnect
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_write_merges_queued_writes(comfoconnect):
+    """Writes that queue behind an in-flight write to the same setting are merged, and only the latest value is sent."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    first = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x01)))
+    await _settle()
+    second = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x02)))
+    third = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x03)))
+    await _settle()
+    assert rmi.sent == [_SET_SPEED(1, 0x01)]
+
+    rmi.replies[0].set_result("first")
+    await _settle()
+    assert rmi.sent == [_SET_SPEED(1, 0x01), _SET_SPEED(1, 0x03)]
+
+    rmi.replies[1].set_result("merged")
+    assert await first == "first"
+    assert await second == "merged"
+    assert await third == "merged"
+
+
+async def test_write_lock_is_dropped_when_no_write_is_pending(comfoconnect):
+    """The lock of a setting is kept while a merged write waits for it, and dropped once no write to the setting is left."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    first = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x01)))
+    await _settle()
+    second = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x02)))
+    await _settle()
+
+    rmi.replies[0].set_result(None)
+    await first
+    assert len(comfoconnect._write_locks) == 1
+
+    await _settle()
+    rmi.replies[1].set_result(None)
+    await second
+    await _settle()
+    assert not comfoconnect._write_locks
+    assert not comfoconnect._pending_writes
+
+
+async def test_write_other_settings_are_not_merged(comfoconnect):
+    """Writes to different settings are sent independently."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    speed = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x01)))
+    bypass = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_BYPASS(-1, 0x01)))
+    await _settle()
+    assert rmi.sent == [_SET_SPEED(1, 0x01), _SET_BYPASS(-1, 0x01)]
+
+    for reply in rmi.replies:
+        reply.set_result(None)
+    await asyncio.gather(speed, bypass)
+
+
+async def test_write_cancelled_caller_does_not_cancel_merged_callers(comfoconnect):
+    """Cancelling one of the merged callers still sends the write and returns the result to the others."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    first = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x01)))
+    await _settle()
+    second = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x02)))
+    third = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x03)))
+    await _settle()
+
+    # Cancel the caller of the in-flight write and the caller that started the merge
+    first.cancel()
+    second.cancel()
+    await _settle()
+    assert rmi.sent == [_SET_SPEED(1, 0x01)]
+
+    rmi.replies[0].set_result("first")
+    await _settle()
+    assert rmi.sent == [_SET_SPEED(1, 0x01), _SET_SPEED(1, 0x03)]
+
+    rmi.replies[1].set_result("merged")
+    assert await third == "merged"
+
+    for task in (first, second):
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+async def test_write_error_reaches_all_merged_callers(comfoconnect):
+    """An error from the merged write is raised to every caller that was merged into it."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    first = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x01)))
+    await _settle()
+    second = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x02)))
+    third = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x03)))
+    await _settle()
+
+    rmi.replies[0].set_result(None)
+    await _settle()
+    rmi.replies[1].set_exception(ValueError("rejected"))
+
+    await first
+    for task in (second, third):
+        with pytest.raises(ValueError):
+            await task
+
+
+async def test_read_shares_in_flight_request(comfoconnect):
+    """Identical reads that overlap share a single request."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    reads = [asyncio.create_task(comfoconnect._cmd_rmi_read(_GET_SPEED)) for _ in range(3)]
+    await _settle()
+    assert rmi.sent == [_GET_SPEED]
+
+    rmi.replies[0].set_result("speed")
+    assert await asyncio.gather(*reads) == ["speed"] * 3
+
+
+async def test_read_after_write_does_not_join_older_read(comfoconnect):
+    """A read that starts after a write to the same setting has completed sends a new request."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    old_read = asyncio.create_task(comfoconnect._cmd_rmi_read(_GET_SPEED))
+    await _settle()
+    write = asyncio.create_task(comfoconnect._cmd_rmi_write(_SET_SPEED(1, 0x03)))
+    await _settle()
+    rmi.replies[1].set_result(None)
+    await write
+
+    new_read = asyncio.create_task(comfoconnect._cmd_rmi_read(_GET_SPEED))
+    await _settle()
+    assert rmi.sent == [_GET_SPEED, _SET_SPEED(1, 0x03), _GET_SPEED]
+
+    # The older read completing must not stop a later read from sharing the newer one
+    rmi.replies[0].set_result("old")
+    assert await old_read == "old"
+    shared_read = asyncio.create_task(comfoconnect._cmd_rmi_read(_GET_SPEED))
+    await _settle()
+    assert len(rmi.sent) == 3
+
+    rmi.replies[2].set_result("new")
+    assert await new_read == "new"
+    assert await shared_read == "new"
+
+
+async def test_read_after_set_property_does_not_join_older_read(comfoconnect):
+    """A property read that starts after set_property has completed sends a new request."""
+    rmi = comfoconnect.cmd_rmi_request
+    get_property = _GET_PROPERTY.pack(0x01, 0x01, 0x01, 0x10, 0x14)
+
+    old_read = asyncio.create_task(comfoconnect._cmd_rmi_read(get_property))
+    await _settle()
+    write = asyncio.create_task(comfoconnect.set_property(0x01, 0x01, 0x14, 0x02))
+    await _settle()
+    rmi.replies[1].set_result(SimpleNamespace(message=b""))
+    await write
+
+    new_read = asyncio.create_task(comfoconnect._cmd_rmi_read(get_property))
+    await _settle()
+    assert rmi.sent[2] == get_property
+
+    rmi.replies[0].set_result("old")
+    rmi.replies[2].set_result("new")
+    assert await old_read == "old"
+    assert await new_read == "new"
+
+
+async def test_disconnect_while_connecting_stops_connect(comfoconnect):
+    """Disconnecting while connect() is still retrying makes connect() raise instead of waiting forever."""
+
+    async def _connect(uuid):
+        raise AioComfoConnectTimeout("Timeout while connecting to bridge")
+
+    comfoconnect._connect = _connect
+
+    connect = asyncio.create_task(comfoconnect.connect("00000000000000000000000000000001"))
+    await _settle()
+    await comfoconnect.disconnect()
+
+    with pytest.raises(AioComfoConnectNotConnected):
+        await asyncio.wait_for(connect, 1)
+
+
+async def test_connect_raises_unhandled_error(comfoconnect):
+    """An error the reconnect loop doesn't handle is raised by connect()."""
+
+    async def _connect(uuid):
+        raise ConnectionRefusedError()
+
+    comfoconnect._connect = _connect
+
+    with pytest.raises(ConnectionRefusedError):
+        await asyncio.wait_for(comfoconnect.connect("00000000000000000000000000000001"), 1)
+
+
+async def test_disconnect_while_starting_session_stops_reader(comfoconnect):
+    """Disconnecting before the session has started also stops the reader of the connection."""
+    read_task = None
+
+    async def _read_messages():
+        try:
+            await asyncio.get_running_loop().create_future()
+        except asyncio.CancelledError:
+            return False
+
+    async def _connect(uuid):
+        nonlocal read_task
+        read_task = asyncio.create_task(_read_messages())
+        return read_task
+
+    async def cmd_start_session(take_over):
+        await asyncio.get_running_loop().create_future()
+
+    comfoconnect._connect = _connect
+    comfoconnect.cmd_start_session = cmd_start_session
+
+    connect = asyncio.create_task(comfoconnect.connect("00000000000000000000000000000001"))
+    await _settle()
+    await comfoconnect.disconnect()
+
+    assert read_task.done()
+    with pytest.raises(AioComfoConnectNotConnected):
+        await asyncio.wait_for(connect, 1)
+
+
+JSON_VALUES = [
+    (21.5, b"21.5"),
+    ("\u00b0C", '"\u00b0C"'.encode()),
+    (["Resistance", "Hood"], b'["Resistance","Hood"]'),
+    (math.nan, b"null"),
+    ([1.0, -math.inf], b"[1.0,null]"),
+]
+
+
+@pytest.mark.parametrize("value, expected", JSON_VALUES)
+def test_json_bytes_with_orjson(monkeypatch, value, expected):
+    """Sensor values are serialized with orjson when it's installed."""
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr("aiocomfoconnect.comfoconnect.orjson", orjson)
+    assert _json_bytes(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", JSON_VALUES)
+def test_json_bytes_without_orjson(monkeypatch, value, expected):
+    """The fallback serializes sensor values the same way orjson does."""
+    monkeypatch.setattr("aiocomfoconnect.comfoconnect.orjson", None)
+    assert _json_bytes(value) == expected
+
+
+async def test_register_sensors_limits_requests_in_flight(comfoconnect):
+    """Registering many sensors at once keeps a limited number of RPDO requests in flight."""
+    in_flight = 0
+    max_in_flight = 0
+    registered = []
+
+    async def cmd_rpdo_request(pdid, pdo_type, zone=1, timeout=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await _settle()
+        registered.append(pdid)
+        in_flight -= 1
+
+    comfoconnect.cmd_rpdo_request = cmd_rpdo_request
+
+    await asyncio.gather(*(comfoconnect.register_sensor(sensor) for sensor in SENSORS.values()))
+    assert max_in_flight == _RPDO_CONCURRENCY
+    assert sorted(registered) == sorted(SENSORS)
+
+    registered.clear()
+    max_in_flight = 0
+    await comfoconnect._register_sensors()
+    assert max_in_flight == _RPDO_CONCURRENCY
+    assert sorted(registered) == sorted(SENSORS)
+
+
+async def test_get_flows_for_speeds_reads_them_with_one_request(comfoconnect):
+    """The flows are read with one get multiple properties request and sliced from its response."""
+    rmi = comfoconnect.cmd_rmi_request
+
+    flows = asyncio.create_task(comfoconnect.get_flows_for_speeds(["low", "high", "low"]))
+    await _settle()
+    assert rmi.sent == [bytes([0x02, 0x1E, 0x01, 0x01, 0x12, 0x04, 0x06])]
+
+    rmi.replies[0].set_result(SimpleNamespace(message=(100).to_bytes(2, "little") + (350).to_bytes(2, "little")))
+    assert await flows == {"low": 100, "high": 350}
+
+
+async def test_get_properties_groups_by_unit_and_subunit(comfoconnect):
+    """Properties of the same unit and subunit are read with one request, and returned in the order they were asked for."""
+    rmi = comfoconnect.cmd_rmi_request
+    props = [
+        Property(0x01, 0x01, 0x04, PdoType.TYPE_CN_STRING),
+        Property(0x20, 0x01, 0x03, PdoType.TYPE_CN_STRING),
+        Property(0x01, 0x01, 0x06, PdoType.TYPE_CN_UINT32),
+        Property(0x01, 0x01, 0x14, PdoType.TYPE_CN_STRING),
+    ]
+
+    values = asyncio.create_task(comfoconnect.get_properties(props))
+    await _settle()
+    assert rmi.sent == [
+        bytes([0x02, 0x01, 0x01, 0x01, 0x13, 0x04, 0x06, 0x14]),
+        _GET_PROPERTY.pack(0x01, 0x20, 0x01, 0x10, 0x03),
+    ]
+
+    rmi.replies[0].set_result(SimpleNamespace(message=b"BEA000000000000\x00\x00\x10\x10\xc0ComfoAirQ\x00"))
+    rmi.replies[1].set_result(SimpleNamespace(message=b"4210\x00"))
+    assert await values == ["BEA000000000000", "4210", 0xC0101000, "ComfoAirQ"]
+
+
+async def test_get_properties_reads_one_by_one_when_widths_dont_match(comfoconnect):
+    """When the response doesn't match the widths of the property types, the properties are read one by one."""
+    rmi = comfoconnect.cmd_rmi_request
+    props = [
+        Property(0x1D, 0x01, 0x04, PdoType.TYPE_CN_UINT32),
+        Property(0x1D, 0x01, 0x06, PdoType.TYPE_CN_UINT32),
+    ]
+
+    values = asyncio.create_task(comfoconnect.get_properties(props))
+    await _settle()
+    rmi.replies[0].set_result(SimpleNamespace(message=b"\x01\x02"))
+    await _settle()
+    assert rmi.sent[1:] == [
+        _GET_PROPERTY.pack(0x01, 0x1D, 0x01, 0x10, 0x04),
+        _GET_PROPERTY.pack(0x01, 0x1D, 0x01, 0x10, 0x06),
+    ]
+
+    rmi.replies[1].set_result(SimpleNamespace(message=b"\x01"))
+    rmi.replies[2].set_result(SimpleNamespace(message=b"\x02"))
+    assert await values == [1, 2]
+
+
+async def _sensor_comfoconnect(**kwargs):
+    """ComfoConnect that records the sensor updates it emits, with the supply air temperature sensor registered."""
+    updates = []
+    comfoconnect = ComfoConnect("127.0.0.1", "00000000000000000000000000000000", sensor_callback=lambda sensor, value: updates.append((sensor.id, value)), **kwargs)
+
+    async def cmd_rpdo_request(pdid, pdo_type=1, zone=1, timeout=None):
+        return None
+
+    comfoconnect.cmd_rpdo_request = cmd_rpdo_request
+    await comfoconnect.register_sensor(SENSORS[SENSOR_TEMPERATURE_SUPPLY])
+    return comfoconnect, updates
+
+
+async def test_sensor_dedupe_drops_repeated_values():
+    """With sensor_dedupe, an update that repeats the last emitted value is dropped and a changed value is emitted."""
+    comfoconnect, updates = await _sensor_comfoconnect(sensor_dedupe=True)
+
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 216)
+    assert updates == [(SENSOR_TEMPERATURE_SUPPLY, 21.5), (SENSOR_TEMPERATURE_SUPPLY, 21.6)]
+
+
+async def test_sensor_dedupe_always_emits_unheld_values():
+    """Values flushed when the sensor hold expires are always emitted, and become the value later updates are compared with."""
+    comfoconnect, updates = await _sensor_comfoconnect(sensor_dedupe=True)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+
+    # Hold the sensors like connect() does, and let the hold expire with the same value
+    comfoconnect._sensor_hold = asyncio.get_running_loop().call_later(60, comfoconnect._unhold_sensors)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    assert updates == [(SENSOR_TEMPERATURE_SUPPLY, 21.5)]
+    comfoconnect._sensor_hold.cancel()
+    comfoconnect._unhold_sensors()
+    assert updates == [(SENSOR_TEMPERATURE_SUPPLY, 21.5)] * 2
+
+    # The same again after a hold with a new value, which later updates are compared with
+    comfoconnect._sensor_hold = asyncio.get_running_loop().call_later(60, comfoconnect._unhold_sensors)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 220)
+    comfoconnect._sensor_hold.cancel()
+    comfoconnect._unhold_sensors()
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 220)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    assert updates[2:] == [(SENSOR_TEMPERATURE_SUPPLY, 22.0), (SENSOR_TEMPERATURE_SUPPLY, 21.5)]
+
+
+async def test_sensor_updates_are_not_deduped_by_default():
+    """Without sensor_dedupe, every update is emitted."""
+    comfoconnect, updates = await _sensor_comfoconnect()
+
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    comfoconnect._sensor_callback(SENSOR_TEMPERATURE_SUPPLY, 215)
+    assert updates == [(SENSOR_TEMPERATURE_SUPPLY, 21.5)] * 2
+
+
+# Error bits 21 and 70 have a message, bit 0 doesn't
+ALARM_ERRORS = ((1 << 70) | (1 << 21) | 1).to_bytes(9, "little")
+FIRMWARE_1_4_0 = 0xC0101000
+FIRMWARE_1_5_0 = 0xC0101400
+
+
+def _alarm_comfoconnect():
+    """ComfoConnect that records the alarms it emits."""
+    alarms = []
+    comfoconnect = ComfoConnect("127.0.0.1", "00000000000000000000000000000000", alarm_callback=lambda node_id, errors: alarms.append((node_id, errors)))
+    return comfoconnect, alarms
+
+
+async def test_alarm_skips_unknown_bits():
+    """Error bits without a message are skipped."""
+    comfoconnect, alarms = _alarm_comfoconnect()
+
+    comfoconnect._alarm_callback(1, SimpleNamespace(swProgramVersion=FIRMWARE_1_5_0, errors=ALARM_ERRORS))
+    assert alarms == [(1, {21: ERRORS[21], 70: ERRORS[70]})]
+
+
+async def test_alarm_reuses_decoded_errors(monkeypatch):
+    """A repeated alarm of a node reuses the errors decoded for the previous one."""
+    comfoconnect, alarms = _alarm_comfoconnect()
+    decoded = []
+    monkeypatch.setattr("aiocomfoconnect.comfoconnect.bytearray_to_bits", lambda arr: decoded.append(arr) or bytearray_to_bits(arr))
+
+    for _ in range(2):
+        comfoconnect._alarm_callback(1, SimpleNamespace(swProgramVersion=FIRMWARE_1_5_0, errors=ALARM_ERRORS))
+    assert decoded == [ALARM_ERRORS]
+    assert alarms[0] == alarms[1]
+
+    # The cache is kept per node
+    comfoconnect._alarm_callback(2, SimpleNamespace(swProgramVersion=FIRMWARE_1_5_0, errors=ALARM_ERRORS))
+    assert len(decoded) == 2
+
+
+async def test_alarm_decodes_again_when_firmware_changes():
+    """An alarm from a node with other firmware is decoded again, with the messages of that firmware."""
+    comfoconnect, alarms = _alarm_comfoconnect()
+
+    comfoconnect._alarm_callback(1, SimpleNamespace(swProgramVersion=FIRMWARE_1_5_0, errors=ALARM_ERRORS))
+    comfoconnect._alarm_callback(1, SimpleNamespace(swProgramVersion=FIRMWARE_1_4_0, errors=ALARM_ERRORS))
+    assert alarms[0][1][70] == ERRORS[70]
+    assert alarms[1][1][70] == ERRORS_140[70]
+    assert ERRORS[70] != ERRORS_140[70]
+
+
+async def test_alarm_callback_gets_a_copy():
+    """Changing the errors passed to the callback doesn't change the cached errors."""
+    comfoconnect, alarms = _alarm_comfoconnect()
+    alarm = SimpleNamespace(swProgramVersion=FIRMWARE_1_5_0, errors=ALARM_ERRORS)
+
+    comfoconnect._alarm_callback(1, alarm)
+    alarms[0][1].clear()
+    comfoconnect._alarm_callback(1, alarm)
+    assert alarms[1][1] == {21: ERRORS[21], 70: ERRORS[70]}